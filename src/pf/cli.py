@@ -1,15 +1,40 @@
 import os
 import sys
-import hashlib
+from concurrent.futures import ProcessPoolExecutor
+from typing import Dict, List
 
 import click
 
 from pf.db import Database
-from pf.util import ensure_dirs, find_pdfs_in_dir
+from pf.util import ensure_dirs, find_pdfs_in_dir, hash_file, transaction_hash
 from pf.classify import classify_statement, extract_institution_and_account, infer_statement_period
 from pf.parsers.generic import extract_transactions_from_text, categorize_transaction
 
 
+def _process_pdf(pdf_path: str) -> dict:
+    # Runs in a worker process: pure text extraction and parsing, no DB access
+    # Every page is read: imported statements need all of them for their transactions
+    text_pages: List[str] = list(Database.read_pdf_pages(pdf_path))
+    text = "\n".join(text_pages)
+    statement_type, confidence = classify_statement(text)
+    institution, masked_account = extract_institution_and_account(text)
+    parsed = {
+        "statement_type": statement_type,
+        "confidence": confidence,
+        "institution": institution,
+        "masked_account": masked_account,
+    }
+    if confidence < 0.5:
+        return parsed
+
+    period_start, period_end = infer_statement_period(text)
+    parsed["period_start"] = period_start
+    parsed["period_end"] = period_end
+    # Extract transactions heuristically
+    parsed["transactions"] = extract_transactions_from_text(text_pages)
+    return parsed
+
+
 @click.group()
 def cli() -> None:
     pass
@@ -29,99 +54,127 @@ def import_cmd(input_dir: str) -> None:
     db = Database(db_path)
     db.init_if_needed()
 
-    pdf_paths = find_pdfs_in_dir(input_dir)
-    if not pdf_paths:
-        click.echo("No PDF files found.")
-        sys.exit(0)
-
-    imported = 0
-    skipped = 0
-    for pdf_path in pdf_paths:
-        try:
-            with open(pdf_path, "rb") as f:
-                file_bytes = f.read()
-            file_hash = hashlib.sha256(file_bytes).hexdigest()
-
-            if db.statement_exists_by_hash(file_hash):
+    try:
+        pdf_paths = find_pdfs_in_dir(input_dir)
+        if not pdf_paths:
+            click.echo("No PDF files found.")
+            sys.exit(0)
+
+        imported = 0
+        skipped = 0
+        pending = []
+        for pdf_path in pdf_paths:
+            try:
+                file_hash = hash_file(pdf_path)
+            except OSError as exc:
+                click.echo(f"Error importing {pdf_path}: {exc}")
                 skipped += 1
                 continue
-
-            # Read text (first pages) for classification and parsing
-            text, text_pages = db.read_pdf_text(pdf_path)
-            statement_type, confidence = classify_statement(text)
-            institution, masked_account = extract_institution_and_account(text)
-
-            if confidence < 0.5:
-                # Low confidence → move to unclassified and skip
-                dst_dir = os.path.join(unclassified_dir)
-                ensure_dirs([dst_dir])
-                base_name = os.path.basename(pdf_path)
-                dst_path = os.path.join(dst_dir, base_name)
-                if os.path.abspath(pdf_path) != os.path.abspath(dst_path):
-                    try:
-                        os.rename(pdf_path, dst_path)
-                    except OSError:
-                        pass
+            if db.statement_exists_by_hash(file_hash):
                 skipped += 1
                 continue
+            pending.append((pdf_path, file_hash))
+
+        if not pending:
+            click.echo(f"Imported: {imported}, Skipped: {skipped}")
+            return
 
-            # Ensure account
-            account_id = db.ensure_account(
-                account_type=statement_type,
-                name=f"{institution or 'Unknown'} {masked_account or ''}".strip(),
-                institution=institution or "Unknown",
-            )
-
-            # Infer period
-            period_start, period_end = infer_statement_period(text)
-
-            statement_id = db.insert_statement(
-                account_id=account_id,
-                period_start=period_start,
-                period_end=period_end,
-                source_file_path=os.path.abspath(pdf_path),
-                source_file_hash=file_hash,
-                status="parsed",
-            )
-
-            # Extract transactions heuristically
-            transactions = extract_transactions_from_text(text_pages)
-            for txn in transactions:
-                category_id, flags = categorize_transaction(db, txn)
-                db.insert_transaction(
-                    account_id=account_id,
-                    statement_id=statement_id,
-                    posted_at=txn["posted_at"],
-                    description=txn["description"],
-                    merchant=txn.get("merchant"),
-                    amount=txn["amount"],
-                    currency="USD",
-                    category_id=category_id,
-                    is_transfer=0,
-                    is_income=1 if flags.get("is_income") else 0,
-                    is_expense=1 if flags.get("is_expense") else 0,
-                    raw_json=None,
-                )
-
-            imported += 1
-
-            # Archive the processed file
-            yyyy = str(period_end.year)
-            mm = f"{period_end.month:02d}"
-            dst_dir = os.path.join(archive_dir, yyyy, mm)
-            ensure_dirs([dst_dir])
-            base_name = os.path.basename(pdf_path)
-            dst_path = os.path.join(dst_dir, base_name)
-            if os.path.abspath(pdf_path) != os.path.abspath(dst_path):
+        # Text extraction and parsing run in worker processes; all DB writes stay in this process
+        with ProcessPoolExecutor(max_workers=min(len(pending), os.cpu_count() or 1)) as pool:
+            futures = [(pdf_path, file_hash, pool.submit(_process_pdf, pdf_path)) for pdf_path, file_hash in pending]
+            for pdf_path, file_hash, future in futures:
                 try:
-                    os.rename(pdf_path, dst_path)
-                except OSError:
-                    pass
-        except Exception as exc:
-            click.echo(f"Error importing {pdf_path}: {exc}")
-            skipped += 1
-
-    click.echo(f"Imported: {imported}, Skipped: {skipped}")
+                    parsed = future.result()
+
+                    # The same file may appear twice in one batch
+                    if db.statement_exists_by_hash(file_hash):
+                        skipped += 1
+                        continue
+
+                    if parsed["confidence"] < 0.5:
+                        # Low confidence → move to unclassified and skip
+                        dst_dir = os.path.join(unclassified_dir)
+                        ensure_dirs([dst_dir])
+                        base_name = os.path.basename(pdf_path)
+                        dst_path = os.path.join(dst_dir, base_name)
+                        if os.path.abspath(pdf_path) != os.path.abspath(dst_path):
+                            try:
+                                os.rename(pdf_path, dst_path)
+                            except OSError:
+                                pass
+                        skipped += 1
+                        continue
+
+                    institution = parsed["institution"]
+                    masked_account = parsed["masked_account"]
+                    period_start = parsed["period_start"]
+                    period_end = parsed["period_end"]
+
+                    # One transaction per statement: the account, statement and its rows commit together
+                    with db.transaction():
+                        # Ensure account
+                        account_id = db.ensure_account(
+                            account_type=parsed["statement_type"],
+                            name=f"{institution or 'Unknown'} {masked_account or ''}".strip(),
+                            institution=institution or "Unknown",
+                        )
+
+                        statement_id = db.insert_statement(
+                            account_id=account_id,
+                            period_start=period_start,
+                            period_end=period_end,
+                            source_file_path=os.path.abspath(pdf_path),
+                            source_file_hash=file_hash,
+                            status="parsed",
+                        )
+
+                        rows = []
+                        occurrences: Dict[tuple, int] = {}
+                        for txn in parsed["transactions"]:
+                            category_id, flags = categorize_transaction(db, txn)
+                            key = (txn["posted_at"], txn["amount"], txn["description"])
+                            occurrence = occurrences.get(key, 0)
+                            occurrences[key] = occurrence + 1
+                            rows.append(
+                                (
+                                    account_id,
+                                    statement_id,
+                                    txn["posted_at"],
+                                    txn["description"],
+                                    txn.get("merchant"),
+                                    txn["amount"],
+                                    "USD",
+                                    category_id,
+                                    0,
+                                    1 if flags.get("is_income") else 0,
+                                    1 if flags.get("is_expense") else 0,
+                                    None,
+                                    transaction_hash(account_id, txn["posted_at"], txn["amount"], txn["description"], occurrence),
+                                )
+                            )
+                        db.insert_transactions_bulk(rows)
+
+                    imported += 1
+
+                    # Archive the processed file
+                    yyyy = str(period_end.year)
+                    mm = f"{period_end.month:02d}"
+                    dst_dir = os.path.join(archive_dir, yyyy, mm)
+                    ensure_dirs([dst_dir])
+                    base_name = os.path.basename(pdf_path)
+                    dst_path = os.path.join(dst_dir, base_name)
+                    if os.path.abspath(pdf_path) != os.path.abspath(dst_path):
+                        try:
+                            os.rename(pdf_path, dst_path)
+                        except OSError:
+                            pass
+                except Exception as exc:
+                    click.echo(f"Error importing {pdf_path}: {exc}")
+                    skipped += 1
+
+        click.echo(f"Imported: {imported}, Skipped: {skipped}")
+    finally:
+        db.close()
 
 
 def main() -> None:
@@ -1,23 +1,62 @@
 import os
 import sqlite3
 import datetime as dt
-from typing import Optional, List
+from contextlib import contextmanager
+from typing import Iterator, Optional, List
 
 from pypdf import PdfReader
 
+# Dates are stored as ISO text; registering the adapters once lets callers bind date/datetime objects directly
+sqlite3.register_adapter(dt.date, lambda d: f"{d.year:04d}-{d.month:02d}-{d.day:02d}")
+sqlite3.register_adapter(dt.datetime, lambda d: d.isoformat(timespec="seconds"))
+
 
 class Database:
     def __init__(self, db_path: str) -> None:
         self.db_path = db_path
+        self._conn: Optional[sqlite3.Connection] = None
+        # Category name -> id; categories are few and looked up once per transaction
+        self._cat_cache: dict[str, int] = {}
+        # (name, institution) -> account id; statements mostly reuse a handful of accounts.
+        # A missing institution is keyed as "", mirroring the IFNULL match in ensure_account.
+        self._account_cache: dict[tuple[str, str], int] = {}
 
     def connect(self) -> sqlite3.Connection:
-        conn = sqlite3.connect(self.db_path)
-        conn.execute("PRAGMA foreign_keys = ON;")
-        return conn
+        # One connection per Database, opened lazily. It runs in autocommit mode;
+        # group writes with transaction() so they share a single commit.
+        if self._conn is None:
+            conn = sqlite3.connect(self.db_path, isolation_level=None)
+            conn.execute("PRAGMA journal_mode = WAL;")
+            conn.execute("PRAGMA synchronous = NORMAL;")
+            conn.execute("PRAGMA temp_store = MEMORY;")
+            conn.execute("PRAGMA foreign_keys = ON;")
+            self._conn = conn
+        return self._conn
+
+    def close(self) -> None:
+        if self._conn is not None:
+            self._conn.close()
+            self._conn = None
+
+    @contextmanager
+    def transaction(self) -> Iterator[sqlite3.Connection]:
+        conn = self.connect()
+        conn.execute("BEGIN")
+        try:
+            yield conn
+            conn.execute("COMMIT")
+        except BaseException:
+            # Also covers a failed COMMIT (e.g. SQLITE_BUSY), which leaves the transaction open
+            if conn.in_transaction:
+                conn.execute("ROLLBACK")
+            # Ids created inside the rolled-back transaction no longer exist
+            self._cat_cache.clear()
+            self._account_cache.clear()
+            raise
 
     def init_if_needed(self) -> None:
         os.makedirs(os.path.dirname(self.db_path), exist_ok=True)
-        with self.connect() as conn:
+        with self.transaction() as conn:
             c = conn.cursor()
             c.execute(
                 """
@@ -73,7 +112,7 @@ class Database:
                   posted_at DATE NOT NULL,
                   description TEXT NOT NULL,
                   merchant TEXT,
-                  amount NUMERIC NOT NULL,
+                  amount INTEGER NOT NULL,
                   currency TEXT NOT NULL DEFAULT 'USD',
                   category_id INTEGER,
                   is_transfer INTEGER NOT NULL DEFAULT 0,
@@ -86,6 +125,14 @@ class Database:
             )
             c.execute("CREATE INDEX IF NOT EXISTS idx_tx_account_date ON transactions(account_id, posted_at);")
             c.execute("CREATE INDEX IF NOT EXISTS idx_tx_category_date ON transactions(category_id, posted_at);")
+            # Rows imported before hashes were recorded keep a NULL hash and are left out of the index
+            c.execute("CREATE UNIQUE INDEX IF NOT EXISTS idx_tx_hash ON transactions(hash) WHERE hash IS NOT NULL;")
+
+            # Schema version 1: transaction amounts are stored as integer cents instead of dollars
+            c.execute("PRAGMA user_version;")
+            if c.fetchone()[0] < 1:
+                c.execute("UPDATE transactions SET amount = CAST(ROUND(amount * 100) AS INTEGER);")
+                c.execute("PRAGMA user_version = 1;")
 
             # Seed a few categories if empty
             c.execute("SELECT COUNT(1) FROM categories;")
@@ -102,30 +149,40 @@ class Database:
                     ("Income:Dividend", None, "income"),
                 ]
                 c.executemany("INSERT INTO categories(name, parent_id, type) VALUES (?,?,?)", seed)
-            conn.commit()
+
+            c.execute("SELECT id, name FROM categories;")
+            self._cat_cache = {name: int(cat_id) for cat_id, name in c.fetchall()}
+            c.execute("SELECT id, name, institution FROM accounts ORDER BY id;")
+            self._account_cache = {}
+            for account_id, name, institution in c.fetchall():
+                self._account_cache.setdefault((name, institution or ""), int(account_id))
 
     def statement_exists_by_hash(self, file_hash: str) -> bool:
-        with self.connect() as conn:
-            c = conn.cursor()
-            c.execute("SELECT 1 FROM statements WHERE source_file_hash = ? LIMIT 1", (file_hash,))
-            return c.fetchone() is not None
+        c = self.connect().cursor()
+        c.execute("SELECT 1 FROM statements WHERE source_file_hash = ? LIMIT 1", (file_hash,))
+        return c.fetchone() is not None
 
     def ensure_account(self, account_type: str, name: str, institution: Optional[str]) -> int:
-        with self.connect() as conn:
-            c = conn.cursor()
-            c.execute(
-                "SELECT id FROM accounts WHERE name = ? AND IFNULL(institution,'') = IFNULL(?, '') LIMIT 1",
-                (name, institution),
-            )
-            row = c.fetchone()
-            if row:
-                return int(row[0])
+        key = (name, institution or "")
+        account_id = self._account_cache.get(key)
+        if account_id is not None:
+            return account_id
+        c = self.connect().cursor()
+        c.execute(
+            "SELECT id FROM accounts WHERE name = ? AND IFNULL(institution,'') = IFNULL(?, '') ORDER BY id LIMIT 1",
+            (name, institution),
+        )
+        row = c.fetchone()
+        if row:
+            account_id = int(row[0])
+        else:
             c.execute(
                 "INSERT INTO accounts(type, name, institution, opened_at) VALUES (?,?,?,?)",
-                (account_type, name, institution, dt.date.today().isoformat()),
+                (account_type, name, institution, dt.date.today()),
             )
-            conn.commit()
-            return int(c.lastrowid)
+            account_id = int(c.lastrowid)
+        self._account_cache[key] = account_id
+        return account_id
 
     def insert_statement(
         self,
@@ -136,83 +193,55 @@ class Database:
         source_file_hash: str,
         status: str,
     ) -> int:
-        with self.connect() as conn:
-            c = conn.cursor()
-            c.execute(
-                """
-                INSERT INTO statements(account_id, period_start, period_end, source_file_path, source_file_hash, imported_at, status)
-                VALUES (?,?,?,?,?,?,?)
-                """,
-                (
-                    account_id,
-                    period_start.isoformat(),
-                    period_end.isoformat(),
-                    source_file_path,
-                    source_file_hash,
-                    dt.datetime.now().isoformat(timespec="seconds"),
-                    status,
-                ),
-            )
-            conn.commit()
-            return int(c.lastrowid)
+        c = self.connect().cursor()
+        c.execute(
+            """
+            INSERT INTO statements(account_id, period_start, period_end, source_file_path, source_file_hash, imported_at, status)
+            VALUES (?,?,?,?,?,?,?)
+            """,
+            (
+                account_id,
+                period_start,
+                period_end,
+                source_file_path,
+                source_file_hash,
+                dt.datetime.now(),
+                status,
+            ),
+        )
+        return int(c.lastrowid)
 
-    def insert_transaction(
-        self,
-        account_id: int,
-        statement_id: int,
-        posted_at: dt.date,
-        description: str,
-        merchant: Optional[str],
-        amount: float,
-        currency: str,
-        category_id: Optional[int],
-        is_transfer: int,
-        is_income: int,
-        is_expense: int,
-        raw_json: Optional[str],
-    ) -> int:
-        with self.connect() as conn:
-            c = conn.cursor()
-            c.execute(
-                """
-                INSERT INTO transactions(account_id, statement_id, posted_at, description, merchant, amount, currency, category_id, is_transfer, is_income, is_expense, raw_json)
-                VALUES (?,?,?,?,?,?,?,?,?,?,?,?)
-                """,
-                (
-                    account_id,
-                    statement_id,
-                    posted_at.isoformat(),
-                    description,
-                    merchant,
-                    amount,
-                    currency,
-                    category_id,
-                    is_transfer,
-                    is_income,
-                    is_expense,
-                    raw_json,
-                ),
-            )
-            conn.commit()
-            return int(c.lastrowid)
+    def insert_transactions_bulk(self, rows: List[tuple]) -> None:
+        # Rows are tuples in column order: account_id, statement_id, posted_at, description, merchant, amount,
+        # currency, category_id, is_transfer, is_income, is_expense, raw_json, hash.
+        # Rows whose hash is already stored are skipped.
+        c = self.connect().cursor()
+        c.executemany(
+            """
+            INSERT OR IGNORE INTO transactions(account_id, statement_id, posted_at, description, merchant, amount, currency, category_id, is_transfer, is_income, is_expense, raw_json, hash)
+            VALUES (?,?,?,?,?,?,?,?,?,?,?,?,?)
+            """,
+            rows,
+        )
 
     def get_or_create_category(self, name: str, type_: str) -> int:
-        with self.connect() as conn:
-            c = conn.cursor()
-            c.execute("SELECT id FROM categories WHERE name = ? LIMIT 1", (name,))
-            row = c.fetchone()
-            if row:
-                return int(row[0])
+        cat_id = self._cat_cache.get(name)
+        if cat_id is not None:
+            return cat_id
+        c = self.connect().cursor()
+        c.execute("SELECT id FROM categories WHERE name = ? LIMIT 1", (name,))
+        row = c.fetchone()
+        if row:
+            cat_id = int(row[0])
+        else:
             c.execute("INSERT INTO categories(name, type) VALUES (?,?)", (name, type_))
-            conn.commit()
-            return int(c.lastrowid)
+            cat_id = int(c.lastrowid)
+        self._cat_cache[name] = cat_id
+        return cat_id
 
-    def read_pdf_text(self, pdf_path: str) -> tuple[str, list[str]]:
+    @staticmethod
+    def read_pdf_pages(pdf_path: str, max_pages: int = 3) -> Iterator[str]:
+        # Pages are extracted lazily, one per iteration
         reader = PdfReader(pdf_path)
-        pages_text: List[str] = []
-        max_pages = min(3, len(reader.pages))
-        for i in range(max_pages):
-            page = reader.pages[i]
-            pages_text.append(page.extract_text() or "")
-        full_text = "\n".join(pages_text)
-        return full_text, pages_text
+        for i in range(min(max_pages, len(reader.pages))):
+            yield reader.pages[i].extract_text() or ""
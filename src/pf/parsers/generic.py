@@ -2,120 +2,120 @@ import re
 import datetime as dt
 from typing import List, Dict, Tuple
 
-from dateutil import parser as dateparser
 
-
-_AMOUNT_RE = re.compile(r"(?P<sign>-)?\$?(?P<val>\d{1,3}(?:,\d{3})*(?:\.\d{2})|\d+\.\d{2})")
-_DATE_LINE_RE = re.compile(r"^(?P<date>\d{1,2}[\-/]\d{1,2}(?:[\-/]\d{2,4})?)\s+(?P<rest>.+)$")
-
-
-def _parse_amount(s: str) -> float | None:
-    m = _AMOUNT_RE.search(s)
-    if not m:
-        return None
-    val = float(m.group("val").replace(",", ""))
-    if m.group("sign"):
-        val = -val
-    # Heuristic: amounts with trailing '-' also indicate negative
-    if s.strip().endswith("-"):
-        val = -abs(val)
-    return val
+_AMOUNT_PATTERN = r"(?P<sign>-)?\$?(?P<val>\d{1,3}(?:,\d{3})*(?:\.\d{2})|\d+\.\d{2})"
+_AMOUNT_RE = re.compile(_AMOUNT_PATTERN)
+# One transaction line: date, then the text before the first amount ("desc"), the amount, and whatever
+# follows it ("tail", without trailing blanks). Matched line by line over the whole document, which
+# must be joined from splitlines() so that "\n" is the only line break; [^\S\n] is whitespace that
+# cannot cross one.
+_TXN_RE = re.compile(
+    r"^[^\S\n]*(?P<month>\d{1,2})[\-/](?P<day>\d{1,2})(?:[\-/](?P<year>\d{2,4}))?[^\S\n]+"
+    r"(?P<desc>.*?)" + _AMOUNT_PATTERN + r"(?P<tail>.*\S)?[^\S\n]*$",
+    re.MULTILINE,
+)
+_WHITESPACE_RE = re.compile(r"\s{2,}")
+_YEAR_RE = re.compile(r"\b(20\d{2})\b")
+
+# Simple keyword-based rules, in priority order (first listed wins)
+_MERCHANT_RULES: List[Tuple[str, Tuple[str, str]]] = [
+    ("amazon", ("Shopping", "expense")),
+    ("target", ("Shopping", "expense")),
+    ("walmart", ("Shopping", "expense")),
+    ("whole foods", ("Groceries", "expense")),
+    ("trader joe", ("Groceries", "expense")),
+    ("costco", ("Groceries", "expense")),
+    ("uber", ("Transport", "expense")),
+    ("lyft", ("Transport", "expense")),
+    ("shell", ("Transport", "expense")),
+    ("exxon", ("Transport", "expense")),
+    ("starbucks", ("Dining", "expense")),
+    ("restaurant", ("Dining", "expense")),
+    ("mcdonald", ("Dining", "expense")),
+    ("mortgage", ("Mortgage", "expense")),
+    ("payroll", ("Income:Salary", "income")),
+    ("salary", ("Income:Salary", "income")),
+    ("dividend", ("Income:Dividend", "income")),
+    ("interest", ("Income:Dividend", "income")),
+]
+
+
+def _match_merchant(desc: str) -> Tuple[str, str] | None:
+    # Descriptions are short, so a substring check per rule (each a C-level scan) beats any
+    # Python-level trie or automaton walk here. The first listed rule that matches wins.
+    for key, cat in _MERCHANT_RULES:
+        if key in desc:
+            return cat
+    return None
 
 
-def _parse_date_from_fragment(s: str, default_year: int) -> dt.date | None:
+def _date_from_parts(month: str, day: str, year: str | None, default_year: int) -> dt.date | None:
+    # Components as captured by _TXN_RE, e.g. "1/5", "01-05-24", "1/5/2024"
+    y = int(year) if year else default_year
+    if y < 100:
+        # Same pivot as strptime's %y: 00-68 are 20xx, 69-99 are 19xx
+        y += 2000 if y < 69 else 1900
     try:
-        dtm = dateparser.parse(s, default=dt.datetime(default_year, 1, 1))
-        return dt.date(dtm.year, dtm.month, dtm.day)
-    except Exception:
+        return dt.date(y, int(month), int(day))
+    except ValueError:
         return None
 
 
 def extract_transactions_from_text(pages_text: List[str]) -> List[Dict]:
     # Very naive heuristic: look for lines that start with a date, then a description, and somewhere an amount
     # This will not perfectly parse all providers but gets us started.
-    lines: List[str] = []
-    for page in pages_text:
-        for ln in page.splitlines():
-            if ln.strip():
-                lines.append(ln.strip())
+    # Amounts are signed integer cents.
+    # splitlines() also breaks on \r, \x0c, \x85, \u2028 etc.; _TXN_RE only knows "\n" as a line end
+    all_text = "\n".join(ln for page in pages_text for ln in page.splitlines())
 
     # Infer a default year from any 4-digit year in the doc
     default_year = dt.date.today().year
-    year_match = re.search(r"\b(20\d{2})\b", "\n".join(lines))
+    year_match = _YEAR_RE.search(all_text)
     if year_match:
         default_year = int(year_match.group(1))
 
-    txns: List[Dict] = []
-    for ln in lines:
-        m = _DATE_LINE_RE.match(ln)
-        if not m:
-            continue
-        date_part = m.group("date")
-        rest = m.group("rest")
-        amount = _parse_amount(rest)
-        if amount is None:
-            amount = _parse_amount(ln)
-        if amount is None:
-            continue
-        posted_at = _parse_date_from_fragment(date_part, default_year)
+    posted: List[dt.date] = []
+    descriptions: List[str] = []
+    amounts: List[int] = []
+    for m in _TXN_RE.finditer(all_text):
+        posted_at = _date_from_parts(m.group("month"), m.group("day"), m.group("year"), default_year)
         if not posted_at:
             continue
-
-        description = re.sub(_AMOUNT_RE, "", rest).strip()
-        description = re.sub(r"\s{2,}", " ", description)
-        txn = {
-            "posted_at": posted_at,
-            "description": description or "Transaction",
-            "amount": amount,
-        }
-        txns.append(txn)
-
-    return txns
+        # Amounts always carry exactly two decimals, so dropping "," and "." leaves the value in cents
+        amount = int(m.group("val").replace(",", "").replace(".", ""))
+        if m.group("sign"):
+            amount = -amount
+        description = m.group("desc")
+        tail = m.group("tail")
+        if tail:
+            # Heuristic: amounts with trailing '-' also indicate negative
+            if tail.endswith("-"):
+                amount = -abs(amount)
+            # Further amounts on the line (e.g. a running balance) are left out of the description
+            description += _AMOUNT_RE.sub("", tail)
+        posted.append(posted_at)
+        descriptions.append(_WHITESPACE_RE.sub(" ", description.strip()))
+        amounts.append(amount)
+
+    return [
+        {"posted_at": posted_at, "description": description or "Transaction", "amount": amount}
+        for posted_at, description, amount in zip(posted, descriptions, amounts)
+    ]
 
 
-def categorize_transaction(db, txn: Dict) -> Tuple[int | None, Dict[str, bool]]:
+def categorize_transaction(db, txn: Dict) -> Tuple[int, Dict[str, bool]]:
     desc = (txn.get("description") or "").lower()
-    amount = float(txn.get("amount") or 0)
+    amount = txn.get("amount") or 0
 
     is_income = amount > 0
     is_expense = amount < 0
 
-    # Simple keyword-based rules
-    mapping = [
-        ("amazon", ("Shopping", "expense")),
-        ("target", ("Shopping", "expense")),
-        ("walmart", ("Shopping", "expense")),
-        ("whole foods", ("Groceries", "expense")),
-        ("trader joe", ("Groceries", "expense")),
-        ("costco", ("Groceries", "expense")),
-        ("uber", ("Transport", "expense")),
-        ("lyft", ("Transport", "expense")),
-        ("shell", ("Transport", "expense")),
-        ("exxon", ("Transport", "expense")),
-        ("starbucks", ("Dining", "expense")),
-        ("restaurant", ("Dining", "expense")),
-        ("mcdonald", ("Dining", "expense")),
-        ("mortgage", ("Mortgage", "expense")),
-        ("payroll", ("Income:Salary", "income")),
-        ("salary", ("Income:Salary", "income")),
-        ("dividend", ("Income:Dividend", "income")),
-        ("interest", ("Income:Dividend", "income")),
-    ]
-
-    chosen: Tuple[str, str] | None = None
-    for key, cat in mapping:
-        if key in desc:
-            chosen = cat
-            break
-
+    chosen = _match_merchant(desc)
     if chosen is None:
         chosen_name, chosen_type = ("Uncategorized", "expense" if is_expense else "income")
     else:
         chosen_name, chosen_type = chosen
 
-    try:
-        category_id = db.get_or_create_category(chosen_name, chosen_type)
-    except Exception:
-        category_id = None
+    category_id = db.get_or_create_category(chosen_name, chosen_type)
 
     return category_id, {"is_income": is_income, "is_expense": is_expense}
@@ -1,5 +1,12 @@
 import os
-from typing import List
+import hashlib
+import datetime as dt
+from typing import Iterable, List, Tuple
+
+try:
+    import ahocorasick
+except ImportError:  # optional accelerator (pip install pyahocorasick)
+    ahocorasick = None
 
 
 def ensure_dirs(paths: list[str]) -> None:
@@ -8,9 +15,54 @@ def ensure_dirs(paths: list[str]) -> None:
 
 
 def find_pdfs_in_dir(root_dir: str) -> list[str]:
+    # Iterative scandir walk: DirEntry type checks come from the directory listing, no extra stat calls.
+    # Like os.walk, symlinked directories are not descended into and unreadable directories are skipped.
     pdf_paths: List[str] = []
-    for dirpath, _, filenames in os.walk(root_dir):
-        for fn in filenames:
-            if fn.lower().endswith(".pdf"):
-                pdf_paths.append(os.path.join(dirpath, fn))
+    stack = [root_dir]
+    while stack:
+        try:
+            with os.scandir(stack.pop()) as it:
+                for entry in it:
+                    if entry.is_dir():
+                        if not entry.is_symlink():
+                            stack.append(entry.path)
+                    elif entry.name.lower().endswith(".pdf"):
+                        pdf_paths.append(entry.path)
+        except OSError:
+            continue
     return sorted(pdf_paths)
+
+
+def hash_file(path: str) -> str:
+    """SHA-256 hex digest of a file, computed without reading it into one bytes object."""
+    with open(path, "rb") as f:
+        if hasattr(hashlib, "file_digest"):  # Python 3.11+
+            return hashlib.file_digest(f, "sha256").hexdigest()
+        h = hashlib.sha256()
+        for chunk in iter(lambda: f.read(65536), b""):
+            h.update(chunk)
+        return h.hexdigest()
+
+
+def transaction_hash(account_id: int, posted_at: dt.date, amount_cents: int, description: str, occurrence: int = 0) -> str:
+    """Dedup key for a transaction row.
+
+    occurrence numbers identical rows within one statement (two same-day coffees), so they stay distinct
+    while a re-import of the same statement maps onto the existing rows.
+    """
+    key = f"{account_id}|{posted_at.isoformat()}|{amount_cents}|{description}|{occurrence}"
+    return hashlib.blake2b(key.encode(), digest_size=16).hexdigest()
+
+
+def build_automaton(words: Iterable[Tuple[str, object]]):
+    """Build an Aho-Corasick automaton over (keyword, value) pairs.
+
+    Returns None when pyahocorasick is not installed; callers fall back to plain substring scans.
+    """
+    if ahocorasick is None:
+        return None
+    automaton = ahocorasick.Automaton()
+    for word, value in words:
+        automaton.add_word(word, value)
+    automaton.make_automaton()
+    return automaton